@@ -1,52 +1,135 @@
-from fastapi import HTTPException
+import base64
+import json
+from contextlib import asynccontextmanager
+from decimal import Decimal
 
-import boto3
+from fastapi import Depends, HTTPException, Request
+from fastapi.responses import ORJSONResponse
+
+import aioboto3
+import orjson
+from botocore.config import Config
 from fastapi import FastAPI
+from pydantic import BaseModel
 
 from movies.movies import Movies
 
-app = FastAPI()
+def _decimal_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError
+
+class DecimalORJSONResponse(ORJSONResponse):
+    # DynamoDB returns numbers as Decimal, which orjson doesn't serialize
+    # natively.
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=_decimal_default)
+
+class MovieIn(BaseModel):
+    title: str
+    year: int
+    plot: str
+    rating: float
+
+class MovieKey(BaseModel):
+    title: str
+    year: int
 
-dynamodb = boto3.resource('dynamodb', endpoint_url='http://localhost:8000')
-movie = Movies(dynamodb)
-movie_table = movie.create_table("movies")
+# Reuse pooled connections across requests instead of opening a fresh
+# socket per burst, and let retries use the adaptive token bucket.
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The resource and table are initialized once per process at startup,
+    # outside the request path, so importing the module has no side effects.
+    session = aioboto3.Session()
+    async with session.resource('dynamodb', endpoint_url='http://localhost:8000', config=BOTO_CONFIG) as dynamodb, \
+            session.client('dynamodb', endpoint_url='http://localhost:8000', config=BOTO_CONFIG) as dyn_client:
+        app.state.movies = Movies(dynamodb, dyn_client)
+        await app.state.movies.create_table("movies")
+        yield
+
+async def get_movies(request: Request) -> Movies:
+    # The per-request handle to the Movies service initialized in lifespan;
+    # tests can swap it out via app.dependency_overrides.
+    return request.app.state.movies
+
+app = FastAPI(lifespan=lifespan, default_response_class=DecimalORJSONResponse)
 
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Welcome to the FastAPI DynamoDB Todo App!"}
 
 @app.post("/create_table", response_model=None)
-def create_table():
-    movie_table = movie.create_table("movies")
-    return movie_table
+async def create_table(movie: Movies = Depends(get_movies)):
+    # The table is already created at startup; just report it.
+    return {"table": movie.table.name}
 
 @app.put("/add_movie", response_model=None)
-def add_movie(title: str, year: int, plot: str, rating: float):
+async def add_movie(title: str, year: int, plot: str, rating: float, movie: Movies = Depends(get_movies)):
     # print(title, year, plot, rating)
-    added_movie = movie.add_movie(title, year, plot, rating)
+    added_movie = await movie.add_movie(title, year, plot, rating)
     return added_movie
 
+@app.post("/add_movies", response_model=None)
+async def add_movies(movies: list[MovieIn], movie: Movies = Depends(get_movies)):
+    added_movies = await movie.add_movies([m.model_dump() for m in movies])
+    return added_movies
+
+@app.post("/transact_add_movies", response_model=None)
+async def transact_add_movies(movies: list[MovieIn], movie: Movies = Depends(get_movies)):
+    added_movies = await movie.transact_add_movies([m.model_dump() for m in movies])
+    return added_movies
+
+@app.post("/get_movies")
+async def get_movies_batch(keys: list[MovieKey], movie: Movies = Depends(get_movies)):
+    items = await movie.get_movies([k.model_dump() for k in keys])
+    return items
+
 @app.get("/get_all_movies")
-def get_all_movies(table_name):
-    items = movie.list_all_items(table_name)
+async def get_all_movies(table_name, limit: int = 100, cursor: str = None, fields: str = None,
+                         movie: Movies = Depends(get_movies)):
+    # The cursor is an opaque base64-encoded LastEvaluatedKey, so the
+    # client drives pagination and each request does one bounded scan page.
+    start_key = json.loads(base64.urlsafe_b64decode(cursor)) if cursor else None
+    items, last_key = await movie.scan_page(
+        table_name, limit=limit, start_key=start_key, projection=fields
+    )
+    next_cursor = (
+        base64.urlsafe_b64encode(json.dumps(last_key).encode()).decode()
+        if last_key else None
+    )
+    return {"items": items, "next_cursor": next_cursor}
+
+@app.get("/parallel_scan")
+async def parallel_scan(table_name, total_segments: int = 8, fields: str = None,
+                        movie: Movies = Depends(get_movies)):
+    items = await movie.parallel_scan(table_name, total_segments=total_segments, projection=fields)
+    return items
+
+@app.get("/movies_by_year")
+async def movies_by_year(year: int, movie: Movies = Depends(get_movies)):
+    items = await movie.list_movies_by_year(year)
     return items
 
 @app.get("/get_movie")
-def read_root(title: str, year: int):
-    movie_info = movie.get_movie(title, year)
+async def read_root(title: str, year: int, fields: str = None, movie: Movies = Depends(get_movies)):
+    movie_info = await movie.get_movie(title, year, projection=fields)
     return movie_info
 
 @app.put("/update_movie")
-def update_movie(title: str, year: int, plot: str, rating: float):
-    movie_info = movie.update_movie(title, year, rating, plot)
+async def update_movie(title: str, year: int, plot: str, rating: float, movie: Movies = Depends(get_movies)):
+    movie_info = await movie.update_movie(title, year, rating, plot)
     if not movie_info:
         raise HTTPException(status_code=404, detail="Item not found")
     return movie_info
 
 @app.delete("/delete_movie")
-def delete_movie(title: str, year: int):
-    movie_info = movie.delete_movie(title, year)
-    print(movie_info)
-    if 'ResponseMetadata' not in movie_info:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return {"message": f"Item {title} from year {year} deleted successfully"}
+async def delete_movie(title: str, year: int, movie: Movies = Depends(get_movies)):
+    deleted = await movie.delete_movie(title, year)
+    return {"message": f"Item {title} from year {year} deleted successfully", "deleted": deleted}
@@ -1,22 +1,28 @@
 from movies.movies import Movies
-import boto3
+import aioboto3
+import asyncio
 
-if __name__ == '__main__':
+async def main():
     # Get the service resource.
-    dynamodb = boto3.resource('dynamodb', endpoint_url='http://localhost:8000')
-    movie = Movies(dynamodb)
-    movie_table = movie.create_table("movies")
+    session = aioboto3.Session()
+    async with session.resource('dynamodb', endpoint_url='http://localhost:8000') as dynamodb, \
+            session.client('dynamodb', endpoint_url='http://localhost:8000') as dyn_client:
+        movie = Movies(dynamodb, dyn_client)
+        movie_table = await movie.create_table("movies")
+
+        #await movie_table.wait_until_exists()
 
-    #movie_table.wait_until_exists()
+        # Print out some data about the table.
+        #print(await movie_table.item_count)
 
-    # Print out some data about the table.
-    #print(movie_table.item_count)
+        #await movie.add_movie("The Color of Pomegranates", 1969, "The Color of Pomegranates is a biography", 5.0 )
 
-    #movie.add_movie("The Color of Pomegranates", 1969, "The Color of Pomegranates is a biography", 5.0 )
+        details = await movie.get_movie("The Color of Pomegranates", 1969)
+        print(details)
 
-    details = movie.get_movie("The Color of Pomegranates", 1969)
-    print(details)
+        #items = await movie.list_all_items("movies")
+        #for item in items:
+        #    print(item)
 
-    #items = movie.list_all_items("movies")
-    #for item in items:
-    #    print(item)
\ No newline at end of file
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,13 +1,28 @@
 from decimal import Decimal
 from fastapi import HTTPException
 
-import boto3
+import asyncio
 import logging
+import re
 
+from async_lru import alru_cache
+from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.types import TypeDeserializer
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+def _log_client_error(op, err, **ctx):
+    # One lazy %s-formatted record per failure: nothing is built when the
+    # level is filtered out, and the context fields stay machine-parseable.
+    logger.error(
+        "op=%s code=%s msg=%s",
+        op,
+        err.response["Error"]["Code"],
+        err.response["Error"]["Message"],
+        extra=ctx,
+    )
+
 class Movies:
     """Encapsulates an Amazon DynamoDB table of movie data.
 
@@ -31,23 +46,94 @@ class Movies:
         }
     """
 
-    def __init__(self, dyn_resource):
+    def __init__(self, dyn_resource, dyn_client):
         """
-        :param dyn_resource: A Boto3 DynamoDB resource.
+        :param dyn_resource: An aioboto3 DynamoDB resource.
+        :param dyn_client: An aioboto3 low-level DynamoDB client. The
+            resource's own meta.client applies the document-interface
+            transformations (plain values in and out), so the untransformed
+            client has to be passed in separately for the pre-serialized
+            hot path to speak the typed wire shape.
         """
         self.dyn_resource = dyn_resource
+        # The low-level client is used on the single-item hot path with
+        # pre-serialized items, skipping the resource layer's per-call
+        # TypeSerializer pass over the item dict.
+        self.client = dyn_client
+        # Bind the single-item client methods once so hot calls go straight
+        # to the bound reference instead of re-resolving client attributes
+        # per request.
+        self._put = self.client.put_item
+        self._get = self.client.get_item
+        self._update = self.client.update_item
+        self._delete = self.client.delete_item
+        self.deserializer = TypeDeserializer()
         # The table variable is set during the scenario in the call to
         # 'exists' if the table exists. Otherwise, it is set by 'create_table'.
         self.table = None
 
-    def check_table_exists(self, table_name):
+    # Info attributes are stored under short names to cut the bytes that
+    # every item pays for attribute names on the wire and on disk; the long
+    # names remain the API shape.
+    _INFO_ENCODE = {"plot": "p", "rating": "r"}
+    _INFO_DECODE = {short: long for long, short in _INFO_ENCODE.items()}
+
+    @staticmethod
+    def _typed_key(title, year):
+        # The key in DynamoDB's typed wire shape, as the low-level client
+        # expects it.
+        return {"year": {"N": str(year)}, "title": {"S": title}}
+
+    def _decode_item(self, item):
+        # Map the short stored info names back to the long API names on the
+        # way out. Items written before the short names existed carry the
+        # long names; when an update has since added a short-named twin, the
+        # short name holds the latest write and must win regardless of map
+        # iteration order.
+        info = item.get("info")
+        if isinstance(info, dict):
+            decoded = {}
+            for key, value in info.items():
+                if key in self._INFO_DECODE:
+                    decoded[self._INFO_DECODE[key]] = value
+                elif key not in decoded:
+                    decoded[key] = value
+            item["info"] = decoded
+        return item
+
+    @classmethod
+    def _encode_projection(cls, projection):
+        # Clients project with the long API names; translate them to the
+        # short stored ones, and alias the reserved word 'year'. The alias
+        # is only registered when the substitution actually happened, since
+        # DynamoDB rejects unused ExpressionAttributeNames entries.
+        for long_name, short_name in cls._INFO_ENCODE.items():
+            projection = re.sub(r'\b%s\b' % long_name, short_name, projection)
+        projection, substitutions = re.subn(r'\byear\b', '#y', projection)
+        names = {"#y": "year"} if substitutions else None
+        return projection, names
+
+    def _deserialize(self, item):
+        # Convert a typed client response item back into plain Python values.
+        return self._decode_item(
+            {key: self.deserializer.deserialize(value) for key, value in item.items()}
+        )
+
+    async def _get_table(self, table_name):
+        # Reuse the cached table handle instead of constructing a new
+        # resource object (and its metadata) on every call.
+        if self.table is None or self.table.name != table_name:
+            self.table = await self.dyn_resource.Table(table_name)
+        return self.table
+
+    async def check_table_exists(self, table_name):
 
         # Get the table resource
-        table = self.dyn_resource.Table(table_name)
+        table = await self._get_table(table_name)
 
         try:
             # Try to load the table's metadata
-            table.load()
+            await table.load()
             return True  # If no exception, the table exists
         except ClientError as e:
             # If the table does not exist, a ResourceNotFoundException is thrown
@@ -57,7 +143,7 @@ class Movies:
                 raise e  # For other errors, re-raise the exception
 
 
-    def create_table(self, table_name):
+    async def create_table(self, table_name):
         """
         Creates an Amazon DynamoDB table that can be used to store movie data.
         The table uses the release year of the movie as the partition key and the
@@ -66,11 +152,14 @@ class Movies:
         :param table_name: The name of the table to create.
         :return: The newly created table.
         """
-        if self.check_table_exists(table_name):
-            self.table = self.dyn_resource.Table(table_name)
+        # Already initialized: skip the DescribeTable round trip entirely.
+        if self.table is not None and self.table.name == table_name:
+            return self.table
+        if await self.check_table_exists(table_name):
+            self.table = await self._get_table(table_name)
         else:
             try:
-                self.table = self.dyn_resource.create_table(
+                self.table = await self.dyn_resource.create_table(
                     TableName=table_name,
                     KeySchema=[
                         {"AttributeName": "year", "KeyType": "HASH"},  # Partition key
@@ -85,19 +174,14 @@ class Movies:
                         "WriteCapacityUnits": 10,
                     },
                 )
-                self.table.wait_until_exists()
+                await self.table.wait_until_exists()
             except ClientError as err:
-                logger.error(
-                    "Couldn't create table %s. Here's why: %s: %s",
-                    table_name,
-                    err.response["Error"]["Code"],
-                    err.response["Error"]["Message"],
-                )
+                _log_client_error("create_table", err, table=table_name)
                 raise
             else:
                 return self.table
 
-    def add_movie(self, title, year, plot, rating):
+    async def add_movie(self, title, year, plot, rating):
         """
         Adds a movie to the table.
 
@@ -106,72 +190,325 @@ class Movies:
         :param plot: The plot summary of the movie.
         :param rating: The quality rating of the movie.
         """
-        if self.get_movie(title, year):
-            raise HTTPException(status_code=400, detail="Item already exists")
         try:
-            Item = {
+            item = {
                 "year": year,
                 "title": title,
                 "info": {"plot": plot, "rating": Decimal(str(rating))},
             }
-            self.table.put_item(Item = {
-                "year": year,
-                "title": title,
-                "info": {"plot": plot, "rating": Decimal(str(rating))},
-            })
-            return Item
-        except ClientError as err:
-            logger.error(
-                "Couldn't add movie %s to table %s. Here's why: %s: %s",
-                title,
-                self.table.name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
+            # A conditional put rejects duplicates in a single round trip,
+            # so no existence GET is needed beforehand. The item is sent
+            # pre-serialized for the fixed movie schema.
+            await self._put(
+                TableName=self.table.name,
+                Item={
+                    "year": {"N": str(year)},
+                    "title": {"S": title},
+                    "info": {"M": {"p": {"S": plot}, "r": {"N": str(rating)}}},
+                },
+                ConditionExpression="attribute_not_exists(#y) AND attribute_not_exists(title)",
+                ExpressionAttributeNames={"#y": "year"},
             )
+            self._fetch_movie_cached.cache_invalidate(title, year)
+            return item
+        except ClientError as err:
+            if err.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise HTTPException(status_code=400, detail="Item already exists")
+            _log_client_error("add_movie", err, title=title, table=self.table.name)
             raise
 
-    def list_all_items(self, table_name):
+    async def add_movies(self, movies):
+        """
+        Adds a batch of movies to the table. The batch writer groups the
+        puts into BatchWriteItem calls of up to 25 items and retries any
+        unprocessed items itself.
 
-        # Get the table resource
-        table = self.dyn_resource.Table(table_name)
+        :param movies: A list of dicts with title, year, plot and rating keys.
+        :return: The items that were written.
+        """
+        items = [
+            {
+                "year": m["year"],
+                "title": m["title"],
+                "info": {"plot": m["plot"], "rating": Decimal(str(m["rating"]))},
+            }
+            for m in movies
+        ]
+        try:
+            async with self.table.batch_writer() as batch:
+                for item in items:
+                    await batch.put_item(Item={
+                        "year": item["year"],
+                        "title": item["title"],
+                        "info": {
+                            self._INFO_ENCODE[key]: value
+                            for key, value in item["info"].items()
+                        },
+                    })
+            for item in items:
+                self._fetch_movie_cached.cache_invalidate(item["title"], item["year"])
+            return items
+        except ClientError as err:
+            _log_client_error("add_movies", err, count=len(items), table=self.table.name)
+            raise
+
+    async def transact_add_movies(self, movies):
+        """
+        Adds movies with all-or-nothing semantics. TransactWriteItems
+        supports up to 100 operations atomically, so clients don't have to
+        simulate atomicity with N PutItem calls plus rollback logic. Inputs
+        larger than 100 movies are split into chunks that are each atomic
+        on their own.
 
-        # Scan the table and retrieve all items
-        response = table.scan()
-        data = response['Items']
+        :param movies: A list of dicts with title, year, plot and rating keys.
+        :return: The items that were written.
+        """
+        items = [
+            {
+                "year": m["year"],
+                "title": m["title"],
+                "info": {"plot": m["plot"], "rating": Decimal(str(m["rating"]))},
+            }
+            for m in movies
+        ]
+        try:
+            for start in range(0, len(movies), 100):
+                await self.client.transact_write_items(
+                    TransactItems=[
+                        {
+                            "Put": {
+                                "TableName": self.table.name,
+                                "Item": {
+                                    "year": {"N": str(m["year"])},
+                                    "title": {"S": m["title"]},
+                                    "info": {"M": {
+                                        "p": {"S": m["plot"]},
+                                        "r": {"N": str(m["rating"])},
+                                    }},
+                                },
+                                "ConditionExpression": "attribute_not_exists(title)",
+                            }
+                        }
+                        for m in movies[start:start + 100]
+                    ]
+                )
+            for item in items:
+                self._fetch_movie_cached.cache_invalidate(item["title"], item["year"])
+            return items
+        except ClientError as err:
+            if err.response['Error']['Code'] == 'TransactionCanceledException':
+                # Only a failed duplicate condition is the client's fault;
+                # other cancellation reasons (throttling, validation, ...)
+                # are server-side errors.
+                reasons = err.response.get('CancellationReasons', [])
+                if any(reason.get('Code') == 'ConditionalCheckFailed' for reason in reasons):
+                    raise HTTPException(status_code=400, detail="Item already exists")
+            _log_client_error("transact_add_movies", err, count=len(items), table=self.table.name)
+            raise
 
-        # Handle pagination if needed
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            data.extend(response['Items'])
+    async def get_movies(self, keys):
+        """
+        Gets a batch of movies from the table. Keys are grouped into
+        BatchGetItem calls of up to 100 keys, and unprocessed keys are
+        retried with exponential backoff.
+
+        :param keys: A list of dicts with title and year keys.
+        :return: The items that were found.
+        """
+        items = []
+        try:
+            for start in range(0, len(keys), 100):
+                request_keys = [
+                    {"year": k["year"], "title": k["title"]}
+                    for k in keys[start:start + 100]
+                ]
+                delay = 0.05
+                while request_keys:
+                    response = await self.dyn_resource.batch_get_item(
+                        RequestItems={self.table.name: {"Keys": request_keys}}
+                    )
+                    items.extend(
+                        self._decode_item(item)
+                        for item in response["Responses"].get(self.table.name, [])
+                    )
+                    # Re-queue any keys DynamoDB couldn't process this round.
+                    unprocessed = response.get("UnprocessedKeys", {})
+                    request_keys = unprocessed.get(self.table.name, {}).get("Keys", [])
+                    if request_keys:
+                        await asyncio.sleep(delay)
+                        delay *= 2
+            return items
+        except ClientError as err:
+            _log_client_error("get_movies", err, table=self.table.name)
+            raise
 
-        return data
+    async def list_all_items(self, table_name, projection=None):
+        """
+        Scans the table page by page and yields items one at a time, so
+        memory stays bounded by the page size instead of the table size.
 
-    def get_movie(self, title, year):
+        :param table_name: The name of the table to scan.
+        :param projection: An optional ProjectionExpression so only the
+                           needed attributes cross the network.
         """
-        Gets movie data from the table for a specific movie.
+        paginator = self.client.get_paginator('scan')
+        scan_kwargs = {
+            "TableName": table_name,
+            "PaginationConfig": {"PageSize": 100},
+        }
+        if projection:
+            scan_kwargs["ProjectionExpression"], names = self._encode_projection(projection)
+            if names:
+                scan_kwargs["ExpressionAttributeNames"] = names
 
-        :param title: The title of the movie.
-        :param year: The release year of the movie.
-        :return: The data about the requested movie.
+        try:
+            async for page in paginator.paginate(**scan_kwargs):
+                for item in page['Items']:
+                    # The low-level paginator returns typed attribute values,
+                    # so deserialize back into plain Python values.
+                    yield self._deserialize(item)
+        except ClientError as err:
+            _log_client_error("list_all_items", err, table=table_name)
+            raise
+
+    async def scan_page(self, table_name, limit=100, start_key=None, projection=None):
         """
+        Scans a single page of the table, leaving pagination to the caller.
+        Bounds per-request work and memory by the page size instead of the
+        table size.
+
+        :param table_name: The name of the table to scan.
+        :param limit: The maximum number of items to evaluate for the page.
+        :param start_key: The LastEvaluatedKey from the previous page, if any.
+        :param projection: An optional ProjectionExpression so only the
+                           needed attributes cross the network.
+        :return: The page of items and the key to resume from, or None when
+                 the scan is complete.
+        """
+        scan_kwargs = {"TableName": table_name, "Limit": limit}
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        if projection:
+            scan_kwargs["ProjectionExpression"], names = self._encode_projection(projection)
+            if names:
+                scan_kwargs["ExpressionAttributeNames"] = names
+        try:
+            response = await self.client.scan(**scan_kwargs)
+        except ClientError as err:
+            _log_client_error("scan_page", err, table=table_name)
+            raise
+        items = [self._deserialize(item) for item in response["Items"]]
+        return items, response.get("LastEvaluatedKey")
+
+    async def parallel_scan(self, table_name, total_segments=8, projection=None):
+        """
+        Scans the table with disjoint segments read concurrently, so the
+        wall-clock time of a full scan drops by roughly the segment count
+        (bounded by provisioned throughput).
+
+        :param table_name: The name of the table to scan.
+        :param total_segments: The number of segments to scan concurrently.
+        :param projection: An optional ProjectionExpression so only the
+                           needed attributes cross the network.
+        :return: All items from every segment, merged.
+        """
+        async def scan_segment(segment):
+            items = []
+            scan_kwargs = {
+                "TableName": table_name,
+                "Segment": segment,
+                "TotalSegments": total_segments,
+            }
+            if projection:
+                scan_kwargs["ProjectionExpression"], names = self._encode_projection(projection)
+                if names:
+                    scan_kwargs["ExpressionAttributeNames"] = names
+            while True:
+                response = await self.client.scan(**scan_kwargs)
+                items.extend(self._deserialize(item) for item in response["Items"])
+                if "LastEvaluatedKey" not in response:
+                    return items
+                scan_kwargs["ExclusiveStartKey"] = response["LastEvaluatedKey"]
+
         try:
-            response = self.table.get_item(Key={"year": year, "title": title})
+            segments = await asyncio.gather(
+                *(scan_segment(segment) for segment in range(total_segments))
+            )
         except ClientError as err:
-            logger.error(
-                "Couldn't get movie %s from table %s. Here's why: %s: %s",
-                title,
-                self.table.name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
+            _log_client_error("parallel_scan", err, table=table_name)
+            raise
+        return [item for segment in segments for item in segment]
+
+    async def list_movies_by_year(self, year):
+        """
+        Queries for movies that were released in the specified year. A Query
+        reads only the partition for that year instead of scanning the
+        whole table.
+
+        :param year: The year to query.
+        :return: The list of movies that were released in the specified year.
+        """
+        try:
+            response = await self.table.query(
+                KeyConditionExpression=Key('year').eq(year)
             )
+            movies = response['Items']
+
+            # Handle pagination if needed
+            while 'LastEvaluatedKey' in response:
+                response = await self.table.query(
+                    KeyConditionExpression=Key('year').eq(year),
+                    ExclusiveStartKey=response['LastEvaluatedKey'],
+                )
+                movies.extend(response['Items'])
+            return [self._decode_item(movie) for movie in movies]
+        except ClientError as err:
+            _log_client_error("list_movies_by_year", err, year=year)
+            raise
+
+    async def _fetch_movie(self, title, year, projection=None):
+        get_kwargs = {
+            "TableName": self.table.name,
+            "Key": self._typed_key(title, year),
+        }
+        if projection is not None:
+            get_kwargs["ProjectionExpression"], names = self._encode_projection(projection)
+            if names:
+                get_kwargs["ExpressionAttributeNames"] = names
+        try:
+            response = await self._get(**get_kwargs)
+        except ClientError as err:
+            _log_client_error("get_movie", err, title=title, table=self.table.name)
             raise
         else:
             try:
-                return response['Item']
+                return self._deserialize(response['Item'])
             except KeyError:
                 return None
 
-    def update_movie(self, title, year, rating, plot):
+    @alru_cache(maxsize=10_000)
+    async def _fetch_movie_cached(self, title, year):
+        return await self._fetch_movie(title, year)
+
+    async def get_movie(self, title, year, projection=None):
+        """
+        Gets movie data from the table for a specific movie. Full-item reads
+        are cached in-process per (title, year), so repeated reads of hot
+        keys skip the GetItem round trip; the mutating methods invalidate
+        the cached entry for the keys they touch. Projected reads bypass the
+        cache, since per-projection entries couldn't be invalidated.
+
+        :param title: The title of the movie.
+        :param year: The release year of the movie.
+        :param projection: An optional ProjectionExpression so only the
+                           needed attributes cross the network.
+        :return: The data about the requested movie.
+        """
+        if projection is None:
+            return await self._fetch_movie_cached(title, year)
+        return await self._fetch_movie(title, year, projection)
+
+    async def update_movie(self, title, year, rating, plot):
         """
         Updates rating and plot data for a movie in the table.
 
@@ -179,35 +516,50 @@ class Movies:
         :param year: The release year of the movie to update.
         :param rating: The updated rating to the give the movie.
         :param plot: The updated plot summary to give the movie.
-        :return: The fields that were updated, with their new values.
+        :return: The full updated item, so callers don't need a follow-up read.
         """
         #print("THIS RATING", rating)
         try:
-            response = self.table.update_item(
-                Key={"year": year, "title": title},
-                UpdateExpression="set info.rating=:r, info.plot=:p",
-                ExpressionAttributeValues={":r": Decimal(str(rating)), ":p": plot},
-                ReturnValues="UPDATED_NEW",
+            # The condition makes DynamoDB reject updates to absent items in
+            # one round trip instead of silently upserting them.
+            response = await self._update(
+                TableName=self.table.name,
+                Key=self._typed_key(title, year),
+                UpdateExpression="set info.r=:r, info.p=:p",
+                ExpressionAttributeValues={":r": {"N": str(rating)}, ":p": {"S": plot}},
+                ConditionExpression="attribute_exists(title)",
+                ReturnValues="ALL_NEW",
             )
         except ClientError as err:
-            logger.error(
-                "Couldn't update movie %s in table %s. Here's why: %s: %s",
-                title,
-                self.table.name,
-                err.response["Error"]["Code"],
-                err.response["Error"]["Message"],
-            )
+            if err.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise HTTPException(status_code=404, detail="Item not found")
+            _log_client_error("update_movie", err, title=title, table=self.table.name)
             raise
         else:
-            return response["Attributes"]
-
-    def delete_movie(self, title, year):
-        if not self.get_movie(title, year):
-            raise HTTPException(status_code=400, detail="Item doesn't exists")
-        try:
-            response = self.table.delete_item(Key={"year": year, "title": title})
-        except ClientError as e:
-            raise HTTPException(status_code=500, detail=str(e))
-        return response
+            self._fetch_movie_cached.cache_invalidate(title, year)
+            return self._deserialize(response["Attributes"])
 
+    async def delete_movie(self, title, year):
+        """
+        Deletes a movie from the table.
 
+        :param title: The title of the movie to delete.
+        :param year: The release year of the movie to delete.
+        :return: The item that was deleted, in the API shape.
+        """
+        try:
+            # A conditional delete fails on missing items in a single round
+            # trip, so no existence GET is needed beforehand.
+            response = await self._delete(
+                TableName=self.table.name,
+                Key=self._typed_key(title, year),
+                ConditionExpression="attribute_exists(title)",
+                ReturnValues="ALL_OLD",
+            )
+        except ClientError as err:
+            if err.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                raise HTTPException(status_code=400, detail="Item doesn't exists")
+            _log_client_error("delete_movie", err, title=title, table=self.table.name)
+            raise
+        self._fetch_movie_cached.cache_invalidate(title, year)
+        return self._deserialize(response["Attributes"])
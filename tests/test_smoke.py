@@ -0,0 +1,72 @@
+import socket
+
+import pytest
+
+def _dynamodb_local_running():
+    try:
+        with socket.create_connection(("localhost", 8000), timeout=1):
+            return True
+    except OSError:
+        return False
+
+pytestmark = pytest.mark.skipif(
+    not _dynamodb_local_running(),
+    reason="DynamoDB local is not running on localhost:8000 (docker-compose up)",
+)
+
+pytest.importorskip("aioboto3")
+
+from fastapi.testclient import TestClient
+
+from app import app
+
+TITLE = "Smoke Test Movie"
+YEAR = 2024
+
+def test_movie_crud_roundtrip():
+    with TestClient(app) as client:
+        # Clean slate in case an earlier run left the item behind.
+        client.delete("/delete_movie", params={"title": TITLE, "year": YEAR})
+
+        response = client.put(
+            "/add_movie",
+            params={"title": TITLE, "year": YEAR, "plot": "A smoke test.", "rating": 4.5},
+        )
+        assert response.status_code == 200
+
+        response = client.get("/get_movie", params={"title": TITLE, "year": YEAR})
+        assert response.status_code == 200
+        assert response.json()["info"] == {"plot": "A smoke test.", "rating": 4.5}
+
+        response = client.put(
+            "/update_movie",
+            params={"title": TITLE, "year": YEAR, "plot": "Updated plot.", "rating": 5.0},
+        )
+        assert response.status_code == 200
+        assert response.json()["info"]["plot"] == "Updated plot."
+
+        response = client.delete("/delete_movie", params={"title": TITLE, "year": YEAR})
+        assert response.status_code == 200
+
+        response = client.get("/get_movie", params={"title": TITLE, "year": YEAR})
+        assert response.status_code == 200
+        assert response.json() is None
+
+def test_scan_endpoints_return_pages():
+    with TestClient(app) as client:
+        client.put(
+            "/add_movie",
+            params={"title": TITLE, "year": YEAR, "plot": "A smoke test.", "rating": 4.5},
+        )
+        try:
+            response = client.get("/get_all_movies", params={"table_name": "movies", "limit": 5})
+            assert response.status_code == 200
+            body = response.json()
+            assert "items" in body and "next_cursor" in body
+            assert any(item["title"] == TITLE for item in body["items"]) or body["next_cursor"]
+
+            response = client.get("/parallel_scan", params={"table_name": "movies", "total_segments": 2})
+            assert response.status_code == 200
+            assert any(item["title"] == TITLE for item in response.json())
+        finally:
+            client.delete("/delete_movie", params={"title": TITLE, "year": YEAR})